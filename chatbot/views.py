@@ -9,6 +9,19 @@ import logging
 # Set up logger for moderation events
 moderation_logger = logging.getLogger("chatbot.moderation")
 
+# One AI service per process: the discovered model list and the selected
+# GenerativeModel are reused across requests instead of rebuilt per hit.
+_ai_service = None
+
+
+def _get_ai_service():
+    global _ai_service
+    # Rebuild when the class binding changes so a patched ArtineraryAI
+    # (as in the test suite) is never shadowed by a stale instance.
+    if _ai_service is None or _ai_service.__class__ is not ArtineraryAI:
+        _ai_service = ArtineraryAI()
+    return _ai_service
+
 
 @login_required
 def chat_view(request):
@@ -50,7 +63,7 @@ def chat_view(request):
             ChatMessage.objects.create(session=session, sender="user", message=message)
 
             # Get AI response
-            ai = ArtineraryAI()
+            ai = _get_ai_service()
             response_data = ai.process_message(message, request.user, user_location)
 
             # Log moderation events
@@ -1,8 +1,19 @@
+import functools
 import string
 
 # Base62 alphabet: a-z, A-Z, 0-9 (62 characters total)
 BASE62_ALPHABET = string.ascii_letters + string.digits
 
+# ord-indexed digit values for decoding: one list lookup per character
+# instead of a linear alphabet scan. -1 marks invalid characters.
+_BASE62_LOOKUP = [-1] * 128
+for _index, _char in enumerate(BASE62_ALPHABET):
+    _BASE62_LOOKUP[ord(_char)] = _index
+del _index, _char
+
+# Alphabet as bytes so encoding can write digits straight into a buffer
+_ALPHABET_BYTES = BASE62_ALPHABET.encode("ascii")
+
 
 def base62_encode(num: int) -> str:
     """
@@ -20,13 +31,17 @@ def base62_encode(num: int) -> str:
     if num <= 0:
         raise ValueError("ID must be a positive integer")
 
-    base = len(BASE62_ALPHABET)
-    chars = []
+    # Write digits back-to-front into a fixed buffer instead of growing
+    # a list and reversing it. bit_length // 5 + 1 always covers the
+    # base62 digit count (each digit carries just under 6 bits).
+    buf = bytearray(num.bit_length() // 5 + 1)
+    i = len(buf)
     while num > 0:
-        num, rem = divmod(num, base)
-        chars.append(BASE62_ALPHABET[rem])
+        num, rem = divmod(num, 62)
+        i -= 1
+        buf[i] = _ALPHABET_BYTES[rem]
 
-    return "".join(reversed(chars))
+    return buf[i:].decode("ascii")
 
 
 def base62_decode(code: str) -> int:
@@ -42,17 +57,23 @@ def base62_decode(code: str) -> int:
     Raises:
         ValueError: If code contains invalid characters
     """
-    base = len(BASE62_ALPHABET)
     num = 0
     for ch in code:
-        try:
-            value = BASE62_ALPHABET.index(ch)
-        except ValueError:
+        value = _BASE62_LOOKUP[ord(ch)] if ord(ch) < 128 else -1
+        if value < 0:
             raise ValueError("Invalid character in Base62 code")
-        num = num * base + value
+        num = num * 62 + value
     return num
 
 
+@functools.lru_cache(maxsize=4096)
+def _encode_id(event_id: int) -> str:
+    """Memoized base62_encode: share codes are pure functions of the id,
+    so repeat renders of the same event hit the cache instead of the
+    divmod loop."""
+    return base62_encode(event_id)
+
+
 def get_event_share_code(event_or_id):
     """
     Get the stateless share code for an event.
@@ -70,4 +91,4 @@ def get_event_share_code(event_or_id):
         # Assume integer ID
         event_id = event_or_id
 
-    return base62_encode(event_id)
+    return _encode_id(event_id)
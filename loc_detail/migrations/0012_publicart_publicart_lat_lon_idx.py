@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-08-26 09:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loc_detail", "0011_comment_images_and_reports"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="publicart",
+            index=models.Index(
+                fields=["latitude", "longitude"], name="publicart_lat_lon_idx"
+            ),
+        ),
+    ]
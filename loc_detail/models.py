@@ -176,6 +176,11 @@ class PublicArt(models.Model):
         verbose_name = "Public Art"
         verbose_name_plural = "Public Art Pieces"
         ordering = ["title"]
+        indexes = [
+            models.Index(
+                fields=["latitude", "longitude"], name="publicart_lat_lon_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title or 'Untitled'} by {self.artist_name or 'Unknown'}"
@@ -1,30 +1,52 @@
+from dataclasses import dataclass, field
+from typing import Any
+
 from django.core.management import call_command
 from django.test import TestCase
 from unittest.mock import patch, MagicMock
 
+_UNSET = object()
+
+
+@dataclass
+class FakeArt:
+    """PublicArt stand-in: plain attributes, mocks only where calls are
+    asserted. Cheaper to build than a full MagicMock tree per test."""
+
+    pk: int
+    image: Any
+    thumbnail: Any = None
+    downsample_image: MagicMock = field(default_factory=MagicMock)
+    make_thumbnail: MagicMock = field(default_factory=MagicMock)
+    save: MagicMock = field(default_factory=MagicMock)
+
+
+def _mock_art(pk=1, thumbnail=_UNSET, downsampled=None, thumb=None):
+    """Build a FakeArt with the image/thumbnail hooks configured."""
+    art = FakeArt(
+        pk=pk,
+        image=MagicMock(name=f"img{pk}.jpg"),
+        thumbnail=MagicMock() if thumbnail is _UNSET else thumbnail,
+    )
+    art.downsample_image.return_value = downsampled
+    art.make_thumbnail.return_value = thumb
+    return art
+
+
+def _mock_queryset(arts):
+    """Build a queryset mock that chains filter() and yields the given arts."""
+    qs = MagicMock()
+    qs.filter.return_value = qs
+    qs.count.return_value = len(arts)
+    qs.iterator.return_value = arts
+    return qs
+
 
 class DownsampleImagesCommandTests(TestCase):
     @patch("loc_detail.management.commands.downsample_images.PublicArt")
     def test_downsample_images_dry_run(self, mock_publicart):
-        mock_qs = MagicMock()
+        mock_qs = _mock_queryset([_mock_art(pk=1), _mock_art(pk=2)])
         mock_publicart.objects.filter.return_value.exclude.return_value = mock_qs
-        mock_qs.count.return_value = 2
-        mock_qs.iterator.return_value = [
-            MagicMock(
-                pk=1,
-                image=MagicMock(name="img1.jpg"),
-                thumbnail=MagicMock(),
-                downsample_image=MagicMock(return_value=None),
-                make_thumbnail=MagicMock(return_value=None),
-            ),
-            MagicMock(
-                pk=2,
-                image=MagicMock(name="img2.jpg"),
-                thumbnail=MagicMock(),
-                downsample_image=MagicMock(return_value=None),
-                make_thumbnail=MagicMock(return_value=None),
-            ),
-        ]
         call_command("downsample_images", "--dry-run")
         assert mock_publicart.objects.filter.called
         assert mock_qs.count.called
@@ -32,13 +54,13 @@ class DownsampleImagesCommandTests(TestCase):
 
     @patch("loc_detail.management.commands.downsample_images.PublicArt")
     def test_downsample_images_force_and_regen(self, mock_publicart):
-        mock_art = MagicMock(pk=1, image=MagicMock(name="img1.jpg"), thumbnail=None)
-        mock_art.downsample_image.return_value = MagicMock(name="downsampled.jpg")
-        mock_art.make_thumbnail.return_value = MagicMock(name="thumb.jpg")
-        mock_qs = MagicMock()
+        mock_art = _mock_art(
+            thumbnail=None,
+            downsampled=MagicMock(name="downsampled.jpg"),
+            thumb=MagicMock(name="thumb.jpg"),
+        )
+        mock_qs = _mock_queryset([mock_art])
         mock_publicart.objects.filter.return_value.exclude.return_value = mock_qs
-        mock_qs.count.return_value = 1
-        mock_qs.iterator.return_value = [mock_art]
         call_command(
             "downsample_images", "--force-downsample", "--regenerate-thumbnails"
         )
@@ -49,14 +71,9 @@ class DownsampleImagesCommandTests(TestCase):
 class GenerateThumbnailsCommandTests(TestCase):
     @patch("loc_detail.management.commands.generate_thumbnails.PublicArt")
     def test_generate_thumbnails_default(self, mock_publicart):
-        mock_art = MagicMock(pk=1, image=MagicMock(name="img1.jpg"))
-        mock_art.thumbnail = MagicMock()  # Make thumbnail a MagicMock
-        mock_art.make_thumbnail.return_value = MagicMock(name="thumb.jpg")
-        mock_qs = MagicMock()
+        mock_art = _mock_art(thumb=MagicMock(name="thumb.jpg"))
+        mock_qs = _mock_queryset([mock_art])
         mock_publicart.objects.filter.return_value = mock_qs
-        mock_qs.filter.return_value = mock_qs
-        mock_qs.count.return_value = 1
-        mock_qs.iterator.return_value = [mock_art]
         call_command("generate_thumbnails")
         assert mock_art.make_thumbnail.called
         assert mock_art.thumbnail.save.called
@@ -64,13 +81,9 @@ class GenerateThumbnailsCommandTests(TestCase):
 
     @patch("loc_detail.management.commands.generate_thumbnails.PublicArt")
     def test_generate_thumbnails_force(self, mock_publicart):
-        mock_art = MagicMock(pk=1, image=MagicMock(name="img1.jpg"))
-        mock_art.thumbnail = MagicMock()  # Fix: use MagicMock, not string
-        mock_art.make_thumbnail.return_value = MagicMock(name="thumb.jpg")
-        mock_qs = MagicMock()
+        mock_art = _mock_art(thumb=MagicMock(name="thumb.jpg"))
+        mock_qs = _mock_queryset([mock_art])
         mock_publicart.objects.filter.return_value = mock_qs
-        mock_qs.count.return_value = 1
-        mock_qs.iterator.return_value = [mock_art]
         call_command("generate_thumbnails", "--force")
         assert mock_art.make_thumbnail.called
         assert mock_art.thumbnail.save.called
@@ -2,23 +2,31 @@
 import pytest
 from unittest.mock import patch, MagicMock
 
+# Stubs are built once at import and installed with patch(new=...), so
+# each test swaps in a prebuilt object instead of growing a fresh
+# MagicMock tree. They stay MagicMocks (not SimpleNamespace) because
+# ai_service touches genai attributes beyond the ones configured here.
+_GENAI_STUB = MagicMock()
+_GENAI_STUB.list_models.return_value = [
+    MagicMock(
+        name="models/gemini-pro",
+        supported_generation_methods=["generateContent"],
+    )
+]
+_MODEL_STUB = MagicMock()
+_MODEL_STUB.generate_content.return_value = MagicMock(text="Mocked AI response")
+_GENAI_STUB.GenerativeModel.return_value = _MODEL_STUB
+
+_RESPONSE_STUB = MagicMock()
+_RESPONSE_STUB.status_code = 200
+_RESPONSE_STUB.text = "{}"
+_RESPONSE_STUB.json.return_value = {}
+
 
 @pytest.fixture(autouse=True)
 def mock_gemini_api():
     """Mock Gemini API to speed up tests and prevent real network calls."""
-    with patch("chatbot.ai_service.genai") as mock_genai:
-        # Mock list_models to return a fake model
-        mock_genai.list_models.return_value = [
-            MagicMock(
-                name="models/gemini-pro",
-                supported_generation_methods=["generateContent"],
-            )
-        ]
-        # Mock GenerativeModel and its generate_content method
-        mock_model = MagicMock()
-        mock_model.generate_content.return_value = MagicMock(text="Mocked AI response")
-        mock_genai.GenerativeModel.return_value = mock_model
-
+    with patch("chatbot.ai_service.genai", new=_GENAI_STUB):
         yield
 
 
@@ -26,27 +34,13 @@ def mock_gemini_api():
 def fast_ai_response():
     with patch(
         "chatbot.ai_service.ArtineraryAI._try_generate_with_fallback",
-        return_value="Mocked AI response",
+        new=lambda self, prompt: "Mocked AI response",
     ):
         yield
 
 
 @pytest.fixture(autouse=True)
 def fast_chatbot_mocks():
-    from unittest.mock import patch, MagicMock
-
-    requests_get_patcher = patch("requests.get")
-    mock_get = requests_get_patcher.start()
-    mock_resp = MagicMock()
-    mock_resp.status_code = 200
-    mock_resp.text = "{}"
-    mock_resp.json.return_value = {}
-    mock_get.return_value = mock_resp
-
-    sleep_patcher = patch("time.sleep", lambda *a, **k: None)
-    sleep_patcher.start()
-
-    yield
-
-    requests_get_patcher.stop()
-    sleep_patcher.stop()
+    with patch("requests.get", new=lambda *a, **k: _RESPONSE_STUB):
+        with patch("time.sleep", new=lambda *a, **k: None):
+            yield
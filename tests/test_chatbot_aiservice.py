@@ -131,9 +131,9 @@ class ArtineraryAILocationExtractionTests(TestCase):
 class ArtineraryAINearbyArtworksTests(TestCase):
     """Tests for nearby artworks functionality"""
 
-    def setUp(self):
-        self.ai = ArtineraryAI()
-        self.artwork = PublicArt.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.artwork = PublicArt.objects.create(
             title="Test Artwork",
             artist_name="Test Artist",
             location="Test Location",
@@ -142,6 +142,9 @@ class ArtineraryAINearbyArtworksTests(TestCase):
             longitude=Decimal("-73.9654"),
         )
 
+    def setUp(self):
+        self.ai = ArtineraryAI()
+
     def test_get_nearby_artworks(self):
         """Test getting nearby artworks"""
         nearby = self.ai.get_nearby_artworks(40.7829, -73.9654)
@@ -279,9 +282,9 @@ class ArtineraryAINavigationTests(TestCase):
 class ArtineraryAIProcessMessageTests(TestCase):
     """Tests for main process_message functionality"""
 
-    def setUp(self):
-        self.ai = ArtineraryAI()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username="testuser", email="test@example.com", password="testpass123"
         )
         PublicArt.objects.create(
@@ -293,6 +296,9 @@ class ArtineraryAIProcessMessageTests(TestCase):
             longitude=Decimal("-73.9654"),
         )
 
+    def setUp(self):
+        self.ai = ArtineraryAI()
+
     def test_process_inappropriate_message(self):
         """Test processing inappropriate message"""
         response = self.ai.process_message("you stupid bot", self.user, None)
@@ -386,8 +392,8 @@ class ArtineraryAIFallbackResponseTests(TestCase):
 class ArtineraryAISearchByLocationTests(TestCase):
     """Tests for location-based artwork search"""
 
-    def setUp(self):
-        self.ai = ArtineraryAI()
+    @classmethod
+    def setUpTestData(cls):
         PublicArt.objects.create(
             title="Central Park Art",
             location="Central Park",
@@ -403,6 +409,9 @@ class ArtineraryAISearchByLocationTests(TestCase):
             longitude=Decimal("-73.9571"),
         )
 
+    def setUp(self):
+        self.ai = ArtineraryAI()
+
     def test_search_by_location_neighborhood(self):
         """Test searching by neighborhood"""
         results = self.ai.search_artworks_by_location("Central Park")
@@ -417,14 +426,16 @@ class ArtineraryAISearchByLocationTests(TestCase):
 
     def test_search_by_location_limit(self):
         """Test that location search respects limit"""
-        for i in range(10):
-            PublicArt.objects.create(
+        PublicArt.objects.bulk_create(
+            PublicArt(
                 title=f"Manhattan Art {i}",
                 location="Manhattan",
                 borough="Manhattan",
                 latitude=Decimal("40.7829"),
                 longitude=Decimal("-73.9654"),
             )
+            for i in range(10)
+        )
 
         results = self.ai.search_artworks_by_location("Manhattan", limit=3)
         self.assertLessEqual(len(results), 3)